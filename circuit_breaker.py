@@ -0,0 +1,131 @@
+import threading
+import time
+from typing import Callable, Optional
+
+class CircuitOpenError(Exception):
+    pass
+
+class CircuitBreaker:
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = 0.0
+        # Bumped on every state change; results from calls admitted under an
+        # earlier generation are stale and must not move the breaker
+        self.generation = 0
+        self.trial_in_flight = False
+        self._state = self.CLOSED
+        self.lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self.lock:
+            if self._state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow_request(self) -> Optional[int]:
+        # Returns the generation token to report the result with, or None if rejected
+        with self.lock:
+            if self._state == self.CLOSED:
+                return self.generation
+            if self._state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    return None
+                self.transition(self.HALF_OPEN)
+            # Only let a single trial request through while half open
+            if self.trial_in_flight:
+                return None
+            self.trial_in_flight = True
+            return self.generation
+
+    def record_success(self, generation: int):
+        with self.lock:
+            if generation != self.generation:
+                return
+            self.failures = 0
+            if self._state == self.HALF_OPEN:
+                self.transition(self.CLOSED)
+
+    def record_failure(self, generation: int):
+        with self.lock:
+            if generation != self.generation:
+                return
+            self.failures += 1
+            if self._state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.transition(self.OPEN)
+                self.opened_at = time.monotonic()
+
+    def transition(self, state: str):
+        # Callers must hold self.lock
+        self._state = state
+        self.generation += 1
+        self.failures = 0
+        self.trial_in_flight = False
+
+class AdaptiveLimiter:
+    # AIMD concurrency limit: grow by about one slot per window of fast successful
+    # calls, cut by a multiplicative factor on failures or slow responses
+    def __init__(self, initial_limit: float = 10, min_limit: float = 1, max_limit: float = 100, latency_threshold: float = 1.0, backoff: float = 0.5):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_threshold = latency_threshold
+        self.backoff = backoff
+        self.in_flight = 0
+        self.last_decrease = float('-inf')
+        self.lock = threading.Lock()
+
+    def acquire(self) -> bool:
+        with self.lock:
+            if self.in_flight >= int(self.limit):
+                return False
+            self.in_flight += 1
+            return True
+
+    def release(self):
+        with self.lock:
+            self.in_flight -= 1
+
+    def update(self, started_at: float, success: bool):
+        now = time.monotonic()
+        with self.lock:
+            if success and now - started_at <= self.latency_threshold:
+                self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+            elif started_at >= self.last_decrease:
+                # Calls started before the last decrease saw the old limit, so a
+                # burst of them failing together only counts as one congestion signal
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+                self.last_decrease = now
+
+class DependencyGuard:
+    def __init__(self, name: str, breaker: Optional[CircuitBreaker] = None, limiter: Optional[AdaptiveLimiter] = None):
+        self.name = name
+        self.breaker = breaker or CircuitBreaker()
+        self.limiter = limiter or AdaptiveLimiter()
+
+    def call(self, func: Callable, *args, is_failure: Optional[Callable] = None, **kwargs):
+        if not self.limiter.acquire():
+            raise CircuitOpenError(f"Concurrency limit reached for {self.name}")
+        generation = self.breaker.allow_request()
+        if generation is None:
+            self.limiter.release()
+            raise CircuitOpenError(f"Circuit open for {self.name}")
+        start = time.monotonic()
+        success = False
+        try:
+            result = func(*args, **kwargs)
+            success = not (is_failure and is_failure(result))
+            return result
+        finally:
+            self.limiter.release()
+            self.limiter.update(start, success)
+            if success:
+                self.breaker.record_success(generation)
+            else:
+                self.breaker.record_failure(generation)
@@ -0,0 +1,134 @@
+import sys
+import json
+from dataclasses import dataclass
+from enum import Enum
+from typing import Callable, Dict, Optional, Tuple
+
+def _optional_str(data: Dict, key: str, intern: bool = False) -> Optional[str]:
+    value = data.get(key)
+    if value is None:
+        return None
+    if not isinstance(value, str):
+        raise ValueError(f"Expected '{key}' to be a string, got {type(value).__name__}")
+    return sys.intern(value) if intern else value
+
+def _optional_id(data: Dict, key: str) -> Optional[str]:
+    # PagerDuty and other sources send both string and numeric ids
+    value = data.get(key)
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, int) and not isinstance(value, bool):
+        return str(value)
+    raise ValueError(f"Expected '{key}' to be a string or integer, got {type(value).__name__}")
+
+def _optional_text(data: Dict, key: str) -> Optional[str]:
+    # Structured values are kept as JSON text so they can still be searched and displayed
+    value = data.get(key)
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, sort_keys=True)
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    raise ValueError(f"Expected '{key}' to be text or JSON, got {type(value).__name__}")
+
+class StepKind(Enum):
+    RESOLVE_ALERT = 'resolve_alert'
+    CHECK_METRIC = 'check_metric'
+    RESTART_SERVICE = 'restart_service'
+    NOTIFY_TEAM = 'notify_team'
+    UNKNOWN = 'unknown'
+
+@dataclass(frozen=True, slots=True)
+class Step:
+    action: str
+    kind: StepKind
+    # Metric, service name, message or unrecognised action text, depending on kind
+    target: str = ''
+    threshold: float = 0.0
+
+def extract_metric(action: str) -> str:
+    # Extract metric from the action string
+    # Example: "check CPU usage metric" -> "CPU usage"
+    return action.split('metric')[0].strip()
+
+def extract_threshold(action: str) -> float:
+    # Extract threshold from the action string
+    # Example: "check CPU usage metric if above 90%" -> 90.0
+    words = action.split()
+    for word in words:
+        if word.replace('.', '', 1).isdigit():
+            return float(word)
+    return 0.0
+
+def extract_service_name(action: str) -> str:
+    # Extract service name from the action string
+    # Example: "restart the database service" -> "database"
+    return action.split('service')[0].strip()
+
+def extract_message(action: str) -> str:
+    # Extract message from the action string
+    # Example: "notify the team with message 'Service down'" -> "Service down"
+    if 'message' in action:
+        return action.split('message')[1].strip().strip("'\"")
+    return "No message provided"
+
+def classify_step(action: str, text: str) -> Step:
+    # Classify the model's rewrite of a step action once, when the runbook is loaded
+    if 'resolve the alert' in text:
+        return Step(action, StepKind.RESOLVE_ALERT)
+    elif 'check' in text and 'metric' in text:
+        return Step(action, StepKind.CHECK_METRIC, extract_metric(text), extract_threshold(text))
+    elif 'restart' in text and 'service' in text:
+        return Step(action, StepKind.RESTART_SERVICE, extract_service_name(text))
+    elif 'notify' in text and 'team' in text:
+        return Step(action, StepKind.NOTIFY_TEAM, extract_message(text))
+    return Step(action, StepKind.UNKNOWN, text)
+
+@dataclass(frozen=True, slots=True)
+class Runbook:
+    title: str
+    alert_type: Optional[str]
+    steps: Tuple[Step, ...]
+
+    @classmethod
+    def from_dict(cls, data: Dict, parse_step: Callable[[str], Step]) -> 'Runbook':
+        if not isinstance(data, dict):
+            raise ValueError(f"Expected runbook to be an object, got {type(data).__name__}")
+        steps = data.get('steps', [])
+        if not isinstance(steps, list):
+            raise ValueError("Expected 'steps' to be a list")
+        if not steps:
+            raise ValueError("Runbook has no steps")
+        parsed_steps = []
+        for step in steps:
+            if not isinstance(step, dict) or not isinstance(step.get('action'), str):
+                raise ValueError(f"Invalid runbook step: {step!r}")
+            parsed_steps.append(parse_step(step['action']))
+        return cls(
+            title=_optional_str(data, 'title') or '',
+            alert_type=_optional_str(data, 'alert_type', intern=True),
+            steps=tuple(parsed_steps)
+        )
+
+@dataclass(frozen=True, slots=True)
+class Alert:
+    id: Optional[str] = None
+    type: Optional[str] = None
+    details: Optional[str] = None
+    runbook_link: Optional[str] = None
+    team: Optional[str] = None
+    assigned_team: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Alert':
+        if not isinstance(data, dict):
+            raise ValueError(f"Expected alert to be an object, got {type(data).__name__}")
+        return cls(
+            id=_optional_id(data, 'id'),
+            type=_optional_str(data, 'type', intern=True),
+            details=_optional_text(data, 'details'),
+            runbook_link=_optional_str(data, 'runbook_link'),
+            team=_optional_str(data, 'team', intern=True),
+            assigned_team=_optional_str(data, 'assigned_team', intern=True)
+        )
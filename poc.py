@@ -1,19 +1,87 @@
 import os
+import sys
 import json
+import threading
 import requests
-from typing import Dict, List
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
 from flask import Flask, request, jsonify
 from transformers import pipeline
+from runbook_index import RunbookIndex, load_encoder
+from circuit_breaker import CircuitBreaker, CircuitOpenError, DependencyGuard
+from models import Alert, Runbook, Step, StepKind, classify_step
 
 class OnCallBot:
-    def __init__(self, confluence_base_url: str, confluence_page_id: str, confluence_api_key: str, pagerduty_api_key: str):
+    def __init__(self, confluence_base_url: str, confluence_page_id: str, confluence_api_key: str, pagerduty_api_key: str, min_runbook_score: float = 0.25):
         self.confluence_base_url = confluence_base_url
         self.confluence_page_id = confluence_page_id
         self.confluence_api_key = confluence_api_key
         self.pagerduty_api_key = pagerduty_api_key
+        self.request_timeout = 5.0
+        # Cosine cut-off for the semantic runbook fallback. With the hashing encoder in
+        # test/bench_runbook_index.py unrelated alerts score about 0.20 and matching ones 0.50 at
+        # p10, while a short alert like "disk full on api" scores 0.29. Re-run the benchmark with
+        # --model to recalibrate this for a transformer encoder
+        self.min_runbook_score = min_runbook_score
+        # One guard per known dependency; hosts taken from alert payloads share 'other'
+        # so that webhook input can never grow this dict or the /metrics series
+        self.dependency_hosts = {
+            'api.pagerduty.com': 'pagerduty',
+            urlparse(confluence_base_url).hostname: 'confluence'
+        }
+        self.guards: Dict[str, DependencyGuard] = {
+            name: DependencyGuard(name) for name in ('pagerduty', 'confluence', 'other')
+        }
+        self.runbook_cache: Dict[str, Runbook] = {}
+        self.pending_writes = deque()
+        self.pending_writes_lock = threading.Lock()
+        self.max_pending_writes = 1000
+        self.replay_interval = 30.0
+        self.stop_replay = threading.Event()
+        # Loaded before the runbooks so that their steps can be parsed once at ingestion
+        self.nlp = pipeline("text2text-generation", model="t5-base")
         self.team_contacts = self.fetch_team_contacts()
         self.runbooks = self.fetch_runbooks_from_confluence()
-        self.nlp = pipeline("text2text-generation", model="t5-base")
+        self.runbooks_by_type: Dict[str, Runbook] = {}
+        for runbook in self.runbooks:
+            if runbook.alert_type:
+                self.runbooks_by_type.setdefault(runbook.alert_type, runbook)
+        self.runbook_index = RunbookIndex(self.runbooks, load_encoder())
+        self.replay_thread = threading.Thread(target=self.replay_pending_writes, daemon=True)
+        self.replay_thread.start()
+
+    def close(self):
+        # Stop the background replay of pending writes
+        self.stop_replay.set()
+
+    def guarded_request(self, method: str, url: str, **kwargs) -> requests.Response:
+        # Each dependency gets its own circuit breaker and adaptive concurrency limit
+        dependency = self.dependency_hosts.get(urlparse(url).hostname, 'other')
+        return self.guards[dependency].call(requests.request, method, url, timeout=self.request_timeout,
+                          is_failure=lambda response: response.status_code >= 500, **kwargs)
+
+    def escape_label(self, value: str) -> str:
+        # Escape a Prometheus label value as required by the text exposition format
+        return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+    def breaker_metrics(self) -> str:
+        states = {CircuitBreaker.CLOSED: 0, CircuitBreaker.HALF_OPEN: 1, CircuitBreaker.OPEN: 2}
+        guards = [(self.escape_label(name), guard) for name, guard in self.guards.items()]
+        lines = [
+            '# HELP oncall_circuit_breaker_state Circuit breaker state per dependency (0=closed, 1=half_open, 2=open)',
+            '# TYPE oncall_circuit_breaker_state gauge'
+        ]
+        for name, guard in guards:
+            lines.append(f'oncall_circuit_breaker_state{{dependency="{name}"}} {states[guard.breaker.state]}')
+        lines.append('# HELP oncall_concurrency_limit Adaptive concurrency limit per dependency')
+        lines.append('# TYPE oncall_concurrency_limit gauge')
+        for name, guard in guards:
+            lines.append(f'oncall_concurrency_limit{{dependency="{name}"}} {guard.limiter.limit:.2f}')
+        lines.append('# HELP oncall_pending_writes Writes queued while a dependency was unavailable')
+        lines.append('# TYPE oncall_pending_writes gauge')
+        lines.append(f'oncall_pending_writes {len(self.pending_writes)}')
+        return '\n'.join(lines) + '\n'
 
     def fetch_team_contacts(self) -> Dict[str, str]:
         url = 'https://api.pagerduty.com/teams'
@@ -21,13 +89,17 @@ class OnCallBot:
             'Authorization': f'Token token={self.pagerduty_api_key}',
             'Accept': 'application/vnd.pagerduty+json;version=2'
         }
-        response = requests.get(url, headers=headers)
+        try:
+            response = self.guarded_request('GET', url, headers=headers)
+        except (CircuitOpenError, requests.RequestException) as e:
+            print(f"Failed to fetch PagerDuty teams: {e}")
+            return {}
         if response.status_code == 200:
             teams = response.json().get('teams', [])
             team_contacts = {}
             for team in teams:
                 team_id = team['id']
-                team_name = team['summary']
+                team_name = sys.intern(team['summary'])
                 contact = self.fetch_team_contact(team_id)
                 if contact:
                     team_contacts[team_name] = contact
@@ -42,7 +114,11 @@ class OnCallBot:
             'Authorization': f'Token token={self.pagerduty_api_key}',
             'Accept': 'application/vnd.pagerduty+json;version=2'
         }
-        response = requests.get(url, headers=headers)
+        try:
+            response = self.guarded_request('GET', url, headers=headers)
+        except (CircuitOpenError, requests.RequestException) as e:
+            print(f"Failed to fetch users for team {team_id}: {e}")
+            return 'unknown@example.com'
         if response.status_code == 200:
             users = response.json().get('users', [])
             if users:
@@ -51,100 +127,121 @@ class OnCallBot:
             print(f"Failed to fetch users for team {team_id}: {response.status_code}")
         return 'unknown@example.com'
 
-    def fetch_runbooks_from_confluence(self) -> List[Dict]:
+    def fetch_runbooks_from_confluence(self) -> List[Runbook]:
         url = f'{self.confluence_base_url}/rest/api/content/{self.confluence_page_id}/child/page'
         headers = {
             'Authorization': f'Bearer {self.confluence_api_key}',
             'Accept': 'application/json'
         }
-        response = requests.get(url, headers=headers)
+        try:
+            response = self.guarded_request('GET', url, headers=headers)
+        except (CircuitOpenError, requests.RequestException) as e:
+            print(f"Failed to fetch Confluence pages: {e}")
+            return []
         if response.status_code == 200:
             pages = response.json().get('results', [])
             runbooks = []
             for page in pages:
                 runbook = self.fetch_runbook_content(page['id'])
-                if runbook:
+                if runbook is not None:
                     runbooks.append(runbook)
             return runbooks
         else:
             print(f"Failed to fetch Confluence pages: {response.status_code}")
             return []
 
-    def fetch_runbook_content(self, page_id: str) -> Dict:
+    def parse_runbook(self, content: str, source: str) -> Optional[Runbook]:
+        try:
+            return Runbook.from_dict(json.loads(content), self.parse_step)
+        except json.JSONDecodeError:
+            print(f"Failed to decode JSON content {source}")
+        except ValueError as e:
+            print(f"Invalid runbook {source}: {e}")
+        return None
+
+    def parse_step(self, action: str) -> Step:
+        return classify_step(action, self.nlp(action)[0]['generated_text'])
+
+    def fetch_runbook_content(self, page_id: str) -> Optional[Runbook]:
         url = f'{self.confluence_base_url}/rest/api/content/{page_id}?expand=body.storage'
         headers = {
             'Authorization': f'Bearer {self.confluence_api_key}',
             'Accept': 'application/json'
         }
-        response = requests.get(url, headers=headers)
+        try:
+            response = self.guarded_request('GET', url, headers=headers)
+        except (CircuitOpenError, requests.RequestException) as e:
+            print(f"Failed to fetch Confluence page content: {e}")
+            return None
         if response.status_code == 200:
             content = response.json().get('body', {}).get('storage', {}).get('value', '')
-            try:
-                return json.loads(content)
-            except json.JSONDecodeError:
-                print(f"Failed to decode JSON content for page {page_id}")
-                return {}
+            return self.parse_runbook(content, f"for page {page_id}")
         else:
             print(f"Failed to fetch Confluence page content: {response.status_code}")
-            return {}
+            return None
 
-    def fetch_runbook_from_link(self, runbook_link: str) -> Dict:
+    def fetch_runbook_from_link(self, runbook_link: str) -> Optional[Runbook]:
         headers = {
             'Authorization': f'Bearer {self.confluence_api_key}',
             'Accept': 'application/json'
         }
-        response = requests.get(runbook_link, headers=headers)
+        try:
+            response = self.guarded_request('GET', runbook_link, headers=headers)
+        except (CircuitOpenError, requests.RequestException) as e:
+            # Serve the last copy we fetched from this link while Confluence is unavailable
+            print(f"Failed to fetch runbook content from link, using cached copy: {e}")
+            return self.runbook_cache.get(runbook_link)
         if response.status_code == 200:
             content = response.json().get('body', {}).get('storage', {}).get('value', '')
-            try:
-                return json.loads(content)
-            except json.JSONDecodeError:
-                print(f"Failed to decode JSON content from link {runbook_link}")
-                return {}
+            runbook = self.parse_runbook(content, f"from link {runbook_link}")
+            if runbook is not None:
+                self.runbook_cache[runbook_link] = runbook
+            return runbook
         else:
             print(f"Failed to fetch runbook content from link: {response.status_code}")
-            return {}
+            return self.runbook_cache.get(runbook_link)
 
-    def handle_alert(self, alert: Dict):
-        runbook_link = alert.get('runbook_link')
-        if runbook_link:
-            runbook = self.fetch_runbook_from_link(runbook_link)
-        else:
+    def handle_alert(self, alert: Alert):
+        runbook = None
+        if alert.runbook_link:
+            runbook = self.fetch_runbook_from_link(alert.runbook_link)
+        if runbook is None:
             runbook = self.find_relevant_runbook(alert)
         
-        if runbook:
+        if runbook is not None:
             self.execute_runbook(runbook, alert)
         else:
             self.notify_team("No relevant runbook found", alert)
 
-    def find_relevant_runbook(self, alert: Dict) -> Dict:
-        alert_type = alert.get('type')
-        for runbook in self.runbooks:
-            if runbook.get('alert_type') == alert_type:
-                return runbook
+    def find_relevant_runbook(self, alert: Alert) -> Optional[Runbook]:
+        runbook = self.runbooks_by_type.get(alert.type)
+        if runbook:
+            return runbook
+        # Fall back to semantic matching on the alert's free-text details
+        matches = self.find_relevant_runbooks(alert, top_k=1)
+        if matches and matches[0][1] >= self.min_runbook_score:
+            return matches[0][0]
         return None
 
-    def execute_runbook(self, runbook: Dict, alert: Dict):
-        steps = runbook.get('steps', [])
-        for step in steps:
-            action = self.nlp(step['action'])[0]['generated_text']
-            if 'resolve the alert' in action:
+    def find_relevant_runbooks(self, alert: Alert, top_k: int = 3) -> List[Tuple[Runbook, float]]:
+        text = ' '.join(part for part in (alert.type, alert.details) if part)
+        return self.runbook_index.search(text, top_k=top_k)
+
+    def execute_runbook(self, runbook: Runbook, alert: Alert):
+        for step in runbook.steps:
+            if step.kind is StepKind.RESOLVE_ALERT:
                 self.resolve_alert(alert)
-            elif 'check' in action and 'metric' in action:
-                metric = self.extract_metric(action)
-                threshold = self.extract_threshold(action)
-                self.check_metric(metric, threshold)
-            elif 'restart' in action and 'service' in action:
-                service_name = self.extract_service_name(action)
-                self.restart_service(service_name)
-            elif 'notify' in action and 'team' in action:
-                message = self.extract_message(action)
-                self.notify_team(message, alert)
+            elif step.kind is StepKind.CHECK_METRIC:
+                self.check_metric(step.target, step.threshold)
+            elif step.kind is StepKind.RESTART_SERVICE:
+                self.restart_service(step.target)
+            elif step.kind is StepKind.NOTIFY_TEAM:
+                self.notify_team(step.target, alert)
             else:
-                print(f"Unknown action: {action}")
+                print(f"Unknown action: {step.target}")
 
-    def resolve_alert(self, alert: Dict):
-        incident_id = alert.get('id')
+    def resolve_alert(self, alert: Alert):
+        incident_id = alert.id
         url = f'https://api.pagerduty.com/incidents/{incident_id}'
         headers = {
             'Authorization': f'Token token={self.pagerduty_api_key}',
@@ -157,37 +254,50 @@ class OnCallBot:
                 'status': 'resolved'
             }
         }
-        response = requests.put(url, headers=headers, json=payload)
+        try:
+            response = self.guarded_request('PUT', url, headers=headers, json=payload)
+        except (CircuitOpenError, requests.RequestException) as e:
+            print(f"Queueing resolve for alert {incident_id}: {e}")
+            self.queue_write('PUT', url, headers, payload)
+            return
         if response.status_code == 200:
             print(f"Alert {incident_id} resolved successfully.")
+        elif response.status_code >= 500:
+            print(f"Queueing resolve for alert {incident_id}: {response.status_code} - {response.text}")
+            self.queue_write('PUT', url, headers, payload)
         else:
             print(f"Failed to resolve alert {incident_id}: {response.status_code} - {response.text}")
 
-    def extract_metric(self, action: str) -> str:
-        # Extract metric from the action string
-        # Example: "check CPU usage metric" -> "CPU usage"
-        return action.split('metric')[0].strip()
-
-    def extract_threshold(self, action: str) -> float:
-        # Extract threshold from the action string
-        # Example: "check CPU usage metric if above 90%" -> 90.0
-        words = action.split()
-        for word in words:
-            if word.replace('.', '', 1).isdigit():
-                return float(word)
-        return 0.0
-
-    def extract_service_name(self, action: str) -> str:
-        # Extract service name from the action string
-        # Example: "restart the database service" -> "database"
-        return action.split('service')[0].strip()
-
-    def extract_message(self, action: str) -> str:
-        # Extract message from the action string
-        # Example: "notify the team with message 'Service down'" -> "Service down"
-        if 'message' in action:
-            return action.split('message')[1].strip().strip("'\"")
-        return "No message provided"
+    def queue_write(self, method: str, url: str, headers: Dict, payload: Dict):
+        with self.pending_writes_lock:
+            if len(self.pending_writes) >= self.max_pending_writes:
+                dropped_method, dropped_url, _, _ = self.pending_writes.popleft()
+                print(f"Pending write queue full, dropping {dropped_method} {dropped_url}")
+            self.pending_writes.append((method, url, headers, payload))
+
+    def replay_pending_writes(self):
+        # Runs on a background thread so that a long backlog never delays alert handling
+        while not self.stop_replay.wait(self.replay_interval):
+            self.flush_pending_writes()
+
+    def flush_pending_writes(self):
+        # Replay writes queued while their dependency was unavailable, stopping at the first failure
+        while True:
+            with self.pending_writes_lock:
+                if not self.pending_writes:
+                    return
+                write = self.pending_writes.popleft()
+            method, url, headers, payload = write
+            try:
+                response = self.guarded_request(method, url, headers=headers, json=payload)
+            except (CircuitOpenError, requests.RequestException):
+                response = None
+            if response is None or response.status_code >= 500:
+                with self.pending_writes_lock:
+                    self.pending_writes.appendleft(write)
+                return
+            if response.status_code >= 400:
+                print(f"Dropping queued write to {url}: {response.status_code} - {response.text}")
 
     def check_metric(self, metric: str, threshold: float):
         # Implement metric checking logic here
@@ -197,8 +307,8 @@ class OnCallBot:
         # Implement service restart logic here
         print(f"Restarting service {service_name}")
 
-    def notify_team(self, message: str, alert: Dict):
-        team = alert.get('team')
+    def notify_team(self, message: str, alert: Alert):
+        team = alert.team
         if team in self.team_contacts:
             contact = self.team_contacts[team]
             # Implement notification logic here (e.g., send email, Slack message, etc.)
@@ -212,7 +322,11 @@ class OnCallBot:
             'Authorization': f'Token token={self.pagerduty_api_key}',
             'Accept': 'application/vnd.pagerduty+json;version=2'
         }
-        response = requests.get(url, headers=headers)
+        try:
+            response = self.guarded_request('GET', url, headers=headers)
+        except (CircuitOpenError, requests.RequestException) as e:
+            print(f"Failed to fetch PagerDuty incidents: {e}")
+            return
         if response.status_code == 200:
             incidents = response.json().get('incidents', [])
             for incident in incidents:
@@ -234,18 +348,26 @@ class OnCallBot:
 
 # Flask app to handle webhooks
 app = Flask(__name__)
-bot = OnCallBot(
-    confluence_base_url='https://your-confluence-instance.atlassian.net/wiki',
-    confluence_page_id='your_confluence_page_id',
-    confluence_api_key='your_confluence_api_key',
-    pagerduty_api_key='your_pagerduty_api_key'
-)
+bot = None
 
 @app.route('/webhook', methods=['POST'])
 def webhook():
-    alert = request.json
+    try:
+        alert = Alert.from_dict(request.json)
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
     bot.handle_alert(alert)
     return jsonify({'status': 'success'}), 200
 
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    return bot.breaker_metrics(), 200, {'Content-Type': 'text/plain; version=0.0.4'}
+
 if __name__ == '__main__':
+    bot = OnCallBot(
+        confluence_base_url='https://your-confluence-instance.atlassian.net/wiki',
+        confluence_page_id='your_confluence_page_id',
+        confluence_api_key='your_confluence_api_key',
+        pagerduty_api_key='your_pagerduty_api_key'
+    )
     app.run(port=5000)
@@ -0,0 +1,85 @@
+import numpy as np
+from typing import Callable, List, Tuple
+from models import Runbook
+
+try:
+    import faiss
+except ImportError:
+    faiss = None
+
+Encoder = Callable[[List[str]], np.ndarray]
+
+def load_encoder(model_name_or_path: str = 'sentence-transformers/all-MiniLM-L6-v2', batch_size: int = 64) -> Encoder:
+    # Imported here so that callers passing their own encoder do not need torch installed
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name_or_path)
+    model = AutoModel.from_pretrained(model_name_or_path)
+    model.eval()
+
+    def encode(texts: List[str]) -> np.ndarray:
+        # Encode in batches and mean-pool the token embeddings, ignoring padding tokens
+        embeddings = []
+        for start in range(0, len(texts), batch_size):
+            inputs = tokenizer(texts[start:start + batch_size], padding=True, truncation=True, return_tensors='pt')
+            with torch.no_grad():
+                hidden = model(**inputs).last_hidden_state.numpy()
+            mask = inputs['attention_mask'].numpy()[..., None].astype(np.float32)
+            embeddings.append((hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1.0))
+        return np.concatenate(embeddings).astype(np.float32)
+
+    return encode
+
+class RunbookIndex:
+    def __init__(self, runbooks: List[Runbook], encoder: Encoder, use_ann: bool = False):
+        self.runbooks = runbooks
+        self.encoder = encoder
+        self.embeddings = self.build_embeddings()
+        self.ann_index = self.build_ann_index() if use_ann else None
+
+    def runbook_text(self, runbook: Runbook) -> str:
+        # Combine the searchable parts of a runbook into one string
+        # Example: "High CPU usage high_cpu_usage check CPU usage metric if above 90"
+        parts = [runbook.title, runbook.alert_type]
+        parts.extend(step.action for step in runbook.steps)
+        return ' '.join(part for part in parts if part)
+
+    def build_embeddings(self) -> np.ndarray:
+        if not self.runbooks:
+            return np.zeros((0, 0), dtype=np.float32)
+        texts = [self.runbook_text(runbook) for runbook in self.runbooks]
+        return np.ascontiguousarray(self.normalize(self.encoder(texts)))
+
+    def build_ann_index(self):
+        if faiss is None:
+            print("faiss is not installed, falling back to exact search")
+            return None
+        if not self.runbooks:
+            return None
+        index = faiss.IndexHNSWFlat(self.embeddings.shape[1], 32, faiss.METRIC_INNER_PRODUCT)
+        index.add(self.embeddings)
+        return index
+
+    def normalize(self, vectors: np.ndarray) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def search(self, text: str, top_k: int = 3) -> List[Tuple[Runbook, float]]:
+        if not self.runbooks or not text:
+            return []
+        top_k = min(top_k, len(self.runbooks))
+        query = self.normalize(self.encoder([text]))
+        if self.ann_index is not None:
+            scores, indices = self.ann_index.search(query, top_k)
+            return [(self.runbooks[i], float(s)) for i, s in zip(indices[0], scores[0]) if i >= 0]
+        # Cosine similarity against every runbook in one matrix-vector product
+        scores = self.embeddings @ query[0]
+        if top_k < len(scores):
+            indices = np.argpartition(-scores, top_k)[:top_k]
+        else:
+            indices = np.arange(len(scores))
+        indices = indices[np.argsort(-scores[indices])]
+        return [(self.runbooks[i], float(scores[i])) for i in indices]
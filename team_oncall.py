@@ -1,21 +1,22 @@
 import os
+import sys
 import json
 import requests
 from typing import Dict, List
 from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
 from poc import OnCallBot
+from models import Alert
 
 class TeamOnCall(OnCallBot):
     def __init__(self, team_name: str, confluence_base_url: str, confluence_page_id: str, confluence_api_key: str, pagerduty_api_key: str, slack_bot_token: str, codebase_path: str):
         super().__init__(confluence_base_url, confluence_page_id, confluence_api_key, pagerduty_api_key)
-        self.team_name = team_name
+        self.team_name = sys.intern(team_name)
         self.slack_client = WebClient(token=slack_bot_token)
         self.codebase_path = codebase_path
 
-    def handle_alert(self, alert: Dict):
-        assigned_team = alert.get('assigned_team')
-        if assigned_team == self.team_name:
+    def handle_alert(self, alert: Alert):
+        if alert.assigned_team == self.team_name:
             super().handle_alert(alert)
         else:
             print(f"Alert not assigned to {self.team_name}. Ignoring alert.")
@@ -73,11 +74,11 @@ team_oncall = TeamOnCall(
 )
 
 # Simulated alert
-alert = {
+alert = Alert.from_dict({
     'assigned_team': 'opt',
     'type': 'high_cpu_usage',
     'details': 'CPU usage exceeded 90% for 5 minutes'
-}
+})
 
 # Handle the alert
 team_oncall.handle_alert(alert)
@@ -0,0 +1,80 @@
+import sys
+import os
+import json
+import time
+import random
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from models import Runbook, Step, StepKind, classify_step
+
+SERVICES = ['database', 'api', 'cache', 'queue', 'search', 'auth', 'billing', 'gateway']
+ALERT_TYPES = ['high_cpu_usage', 'memory_leak', 'disk_full', 'high_latency', 'error_rate_spike']
+
+def make_runbook_dicts(step_count: int, steps_per_runbook: int = 5):
+    rng = random.Random(0)
+    runbooks = []
+    for i in range(step_count // steps_per_runbook):
+        service = rng.choice(SERVICES)
+        steps = []
+        for _ in range(steps_per_runbook):
+            steps.append(rng.choice([
+                {'action': f'check {service} latency metric if above {rng.randint(50, 99)}'},
+                {'action': f'restart the {service} service'},
+                {'action': f"notify the team with message '{service} degraded'"},
+                {'action': 'resolve the alert'}
+            ]))
+        runbooks.append({'title': f'{service} runbook #{i}', 'alert_type': rng.choice(ALERT_TYPES), 'steps': steps})
+    return runbooks
+
+def parse_step(action: str) -> Step:
+    # Stands in for OnCallBot.parse_step, without the text2text model
+    return classify_step(action, action)
+
+def measure_memory(build):
+    tracemalloc.start()
+    result = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
+
+def run_dict_steps(runbooks):
+    count = 0
+    for runbook in runbooks:
+        for step in runbook.get('steps', []):
+            if parse_step(step['action']).kind is not StepKind.UNKNOWN:
+                count += 1
+    return count
+
+def run_model_steps(runbooks):
+    count = 0
+    for runbook in runbooks:
+        for step in runbook.steps:
+            if step.kind is not StepKind.UNKNOWN:
+                count += 1
+    return count
+
+def benchmark_models(step_count: int, runs: int = 5):
+    # Build both representations from JSON text so neither shares strings with the other
+    payload = json.dumps(make_runbook_dicts(step_count))
+
+    dict_runbooks, dict_bytes = measure_memory(lambda: json.loads(payload))
+    model_runbooks, model_bytes = measure_memory(lambda: [Runbook.from_dict(data, parse_step) for data in json.loads(payload)])
+
+    start = time.perf_counter()
+    for _ in range(runs):
+        run_dict_steps(dict_runbooks)
+    dict_seconds = (time.perf_counter() - start) / runs
+
+    start = time.perf_counter()
+    for _ in range(runs):
+        run_model_steps(model_runbooks)
+    model_seconds = (time.perf_counter() - start) / runs
+
+    print(f'Steps: {step_count} in {len(model_runbooks)} runbooks')
+    print(f'Memory: dicts {dict_bytes / 1e6:.1f} MB, models {model_bytes / 1e6:.1f} MB')
+    print(f'Dispatch: dicts {step_count / dict_seconds / 1e6:.2f} M steps/s, models {step_count / model_seconds / 1e6:.2f} M steps/s')
+
+# Example usage
+benchmark_models(step_count=100000)
@@ -0,0 +1,94 @@
+import sys
+import os
+import time
+import zlib
+import random
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from models import Runbook, Step, StepKind
+from runbook_index import RunbookIndex, load_encoder
+
+SERVICES = ['database', 'api', 'cache', 'queue', 'search', 'auth', 'billing', 'gateway']
+SYMPTOMS = ['high CPU usage', 'memory leak', 'disk full', 'high latency', 'error rate spike', 'connection timeouts']
+
+def make_runbooks(count: int):
+    rng = random.Random(0)
+    runbooks = []
+    for i in range(count):
+        service = rng.choice(SERVICES)
+        symptom = rng.choice(SYMPTOMS)
+        runbooks.append(Runbook(
+            title=f'{symptom} on {service} #{i}',
+            alert_type=f"{symptom.replace(' ', '_')}_{service}_{i}",
+            steps=(
+                Step(f'check {symptom} metric if above {rng.randint(50, 99)}', StepKind.UNKNOWN),
+                Step(f'restart the {service} service', StepKind.UNKNOWN),
+                Step(f"notify the team with message '{service} {symptom}'", StepKind.UNKNOWN)
+            )
+        ))
+    return runbooks
+
+def hashing_encoder(dim: int = 384):
+    # Dependency-free local encoder: hashed bag of words and word bigrams
+    def encode(texts):
+        vectors = np.zeros((len(texts), dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            words = text.lower().split()
+            for token in words + [' '.join(pair) for pair in zip(words, words[1:])]:
+                vectors[row, zlib.crc32(token.encode()) % dim] += 1.0
+        return vectors
+
+    return encode
+
+def benchmark_runbook_index(count: int, queries: int, encoder, use_ann: bool = False):
+    runbooks = make_runbooks(count)
+
+    start = time.perf_counter()
+    index = RunbookIndex(runbooks, encoder, use_ann=use_ann)
+    build_seconds = time.perf_counter() - start
+
+    rng = random.Random(1)
+    texts = [f'{rng.choice(SYMPTOMS)} detected on {rng.choice(SERVICES)}' for _ in range(queries)]
+    query_vectors = index.normalize(encoder(texts))
+
+    # Similarity lookup only, with the query already encoded
+    start = time.perf_counter()
+    for vector in query_vectors:
+        scores = index.embeddings @ vector
+        scores.argpartition(-3)[-3:]
+    lookup_seconds = time.perf_counter() - start
+
+    # End-to-end search, including encoding the alert text
+    start = time.perf_counter()
+    results = [index.search(text, top_k=3) for text in texts]
+    search_seconds = time.perf_counter() - start
+
+    # Top-1 scores for queries that have a matching runbook, for calibrating OnCallBot's min_runbook_score
+    top_scores = np.array([matches[0][1] for matches in results])
+    relevant = []
+    for query, matches in zip(texts, results):
+        symptom, service = query.split(' detected on ')
+        relevant.append(matches[0][0].title.startswith(f'{symptom} on {service} '))
+    relevant = np.array(relevant)
+    unrelated = [index.search(text, top_k=1)[0][1] for text in ('payment gateway certificate expired', 'kafka consumer lag growing')]
+
+    print(f'Runbooks: {count}, embedding matrix: {index.embeddings.shape} ({index.embeddings.nbytes / 1e6:.1f} MB)')
+    print(f'Index build (encode + normalize): {build_seconds:.2f}s')
+    print(f'Similarity lookup: {lookup_seconds / queries * 1e3:.3f} ms/query')
+    print(f'Search incl. query encoding: {search_seconds / queries * 1e3:.3f} ms/query')
+    print(f'Top-1 relevant: {relevant.mean():.0%}, score p10/median/p90: '
+          f'{np.percentile(top_scores, 10):.2f}/{np.median(top_scores):.2f}/{np.percentile(top_scores, 90):.2f}')
+    print(f'Top-1 score for unrelated alerts: {", ".join(f"{score:.2f}" for score in unrelated)}')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark RunbookIndex build and search times')
+    parser.add_argument('--model', help='Local path or name of a transformers encoder; defaults to a hashing encoder')
+    parser.add_argument('--count', type=int, default=10000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--ann', action='store_true', help='Search through a faiss HNSW index')
+    args = parser.parse_args()
+    encoder = load_encoder(args.model) if args.model else hashing_encoder()
+    benchmark_runbook_index(args.count, args.queries, encoder, use_ann=args.ann)
@@ -0,0 +1,124 @@
+import sys
+import os
+import time
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from circuit_breaker import AdaptiveLimiter, CircuitBreaker, CircuitOpenError, DependencyGuard
+
+def open_breaker(breaker: CircuitBreaker):
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure(breaker.allow_request())
+
+def test_breaker_opens_after_threshold_failures():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    breaker.record_failure(breaker.allow_request())
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure(breaker.allow_request())
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.allow_request() is None
+
+def test_breaker_success_resets_failure_count():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    breaker.record_failure(breaker.allow_request())
+    breaker.record_success(breaker.allow_request())
+    breaker.record_failure(breaker.allow_request())
+    assert breaker.state == CircuitBreaker.CLOSED
+
+def test_breaker_half_open_allows_single_trial():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    open_breaker(breaker)
+    trial = breaker.allow_request()
+    assert trial is not None
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow_request() is None
+    breaker.record_success(trial)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+def test_breaker_failed_trial_reopens():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    open_breaker(breaker)
+    breaker.opened_at -= 60
+    trial = breaker.allow_request()
+    breaker.record_failure(trial)
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.allow_request() is None
+
+def test_breaker_ignores_late_success_from_before_open():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    first, second, late = breaker.allow_request(), breaker.allow_request(), breaker.allow_request()
+    breaker.record_failure(first)
+    breaker.record_failure(second)
+    assert breaker.state == CircuitBreaker.OPEN
+    breaker.record_success(late)
+    assert breaker.state == CircuitBreaker.OPEN
+
+def test_breaker_stale_failure_does_not_release_trial_slot():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    stale = breaker.allow_request()
+    breaker.record_failure(breaker.allow_request())
+    trial = breaker.allow_request()
+    assert trial is not None
+    breaker.record_failure(stale)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow_request() is None
+
+def test_limiter_rejects_above_limit():
+    limiter = AdaptiveLimiter(initial_limit=2)
+    assert limiter.acquire()
+    assert limiter.acquire()
+    assert not limiter.acquire()
+    limiter.release()
+    assert limiter.acquire()
+
+def test_limiter_increases_on_fast_success():
+    limiter = AdaptiveLimiter(initial_limit=4, latency_threshold=1.0)
+    for _ in range(4):
+        limiter.update(time.monotonic(), success=True)
+    assert 4.9 < limiter.limit < 5.0
+
+def test_limiter_decreases_on_slow_response():
+    limiter = AdaptiveLimiter(initial_limit=8, latency_threshold=1.0)
+    limiter.update(time.monotonic() - 2.0, success=True)
+    assert limiter.limit == 4
+
+def test_limiter_decreases_once_per_window():
+    limiter = AdaptiveLimiter(initial_limit=20, latency_threshold=1.0)
+    started_at = time.monotonic()
+    for _ in range(10):
+        limiter.update(started_at, success=False)
+    assert limiter.limit == 10
+    limiter.update(time.monotonic(), success=False)
+    assert limiter.limit == 5
+
+def test_limiter_respects_bounds():
+    limiter = AdaptiveLimiter(initial_limit=1, min_limit=1, max_limit=1)
+    limiter.update(time.monotonic(), success=False)
+    assert limiter.limit == 1
+    limiter.update(time.monotonic(), success=True)
+    assert limiter.limit == 1
+
+def test_guard_releases_slot_on_exception():
+    guard = DependencyGuard('host', limiter=AdaptiveLimiter(initial_limit=1))
+
+    def boom():
+        raise ValueError('boom')
+
+    with pytest.raises(ValueError):
+        guard.call(boom)
+    assert guard.limiter.in_flight == 0
+    assert guard.breaker.failures == 1
+
+def test_guard_fails_fast_when_open():
+    guard = DependencyGuard('host', breaker=CircuitBreaker(failure_threshold=1, reset_timeout=60))
+    guard.call(lambda: 500, is_failure=lambda status: status >= 500)
+    with pytest.raises(CircuitOpenError):
+        guard.call(lambda: 200)
+    assert guard.limiter.in_flight == 0
+
+def test_guard_fails_fast_at_concurrency_limit():
+    guard = DependencyGuard('host', limiter=AdaptiveLimiter(initial_limit=1))
+    guard.limiter.acquire()
+    with pytest.raises(CircuitOpenError):
+        guard.call(lambda: 200)
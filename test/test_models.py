@@ -0,0 +1,104 @@
+import sys
+import os
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from models import Alert, Runbook, Step, StepKind, classify_step
+
+def parse_step(action: str) -> Step:
+    return classify_step(action, action)
+
+def test_alert_from_dict_reads_known_fields():
+    alert = Alert.from_dict({
+        'id': 'P123',
+        'type': 'high_cpu_usage',
+        'details': 'CPU usage exceeded 90% for 5 minutes',
+        'runbook_link': 'https://wiki/runbook',
+        'team': 'opt',
+        'assigned_team': 'opt',
+        'extra': 'ignored'
+    })
+    assert alert == Alert('P123', 'high_cpu_usage', 'CPU usage exceeded 90% for 5 minutes', 'https://wiki/runbook', 'opt', 'opt')
+
+def test_alert_from_dict_interns_type_and_teams():
+    # Build the strings at runtime so they are not interned as literals
+    alert = Alert.from_dict({'type': ''.join(['high_', 'cpu']), 'team': ''.join(['op', 't']), 'assigned_team': ''.join(['op', 't'])})
+    assert alert.type is sys.intern('high_cpu')
+    assert alert.team is sys.intern('opt')
+    assert alert.assigned_team is alert.team
+
+def test_alert_from_dict_converts_numeric_id():
+    assert Alert.from_dict({'id': 123}).id == '123'
+
+def test_alert_from_dict_serializes_structured_details():
+    assert Alert.from_dict({'details': {'cpu': 95, 'host': 'a'}}).details == '{"cpu": 95, "host": "a"}'
+    assert Alert.from_dict({'details': 95}).details == '95'
+
+@pytest.mark.parametrize('data', [
+    None,
+    ['not', 'an', 'object'],
+    {'id': True},
+    {'id': {'nested': 1}},
+    {'type': 5},
+    {'team': ['opt']},
+    {'runbook_link': 1},
+    {'details': True}
+])
+def test_alert_from_dict_rejects_malformed_values(data):
+    with pytest.raises(ValueError):
+        Alert.from_dict(data)
+
+def test_alert_is_frozen_and_slotted():
+    alert = Alert.from_dict({})
+    assert not hasattr(alert, '__dict__')
+    with pytest.raises(AttributeError):
+        alert.type = 'other'
+
+def test_runbook_from_dict_parses_steps_once():
+    calls = []
+
+    def counting_parse(action):
+        calls.append(action)
+        return parse_step(action)
+
+    runbook = Runbook.from_dict({
+        'title': 'High CPU',
+        'alert_type': 'high_cpu_usage',
+        'steps': [{'action': 'restart the database service'}, {'action': 'resolve the alert'}]
+    }, counting_parse)
+    assert runbook.title == 'High CPU'
+    assert runbook.alert_type is sys.intern('high_cpu_usage')
+    assert [step.kind for step in runbook.steps] == [StepKind.RESTART_SERVICE, StepKind.RESOLVE_ALERT]
+    assert calls == ['restart the database service', 'resolve the alert']
+
+def test_runbook_from_dict_defaults():
+    runbook = Runbook.from_dict({'steps': [{'action': 'resolve the alert'}]}, parse_step)
+    assert runbook == Runbook('', None, (Step('resolve the alert', StepKind.RESOLVE_ALERT),))
+
+@pytest.mark.parametrize('data', [
+    'not an object',
+    {},
+    {'title': 'Empty', 'steps': []},
+    {'steps': 'restart'},
+    {'steps': ['restart the api service']},
+    {'steps': [{'action': 5}]},
+    {'steps': [{}]},
+    {'title': 5, 'steps': [{'action': 'resolve the alert'}]},
+    {'alert_type': ['high_cpu'], 'steps': [{'action': 'resolve the alert'}]}
+])
+def test_runbook_from_dict_rejects_malformed_values(data):
+    with pytest.raises(ValueError):
+        Runbook.from_dict(data, parse_step)
+
+@pytest.mark.parametrize('text, expected', [
+    ('resolve the alert', Step('action', StepKind.RESOLVE_ALERT)),
+    ('check CPU usage metric if above 90', Step('action', StepKind.CHECK_METRIC, 'check CPU usage', 90.0)),
+    ('check disk metric', Step('action', StepKind.CHECK_METRIC, 'check disk', 0.0)),
+    ('restart the database service', Step('action', StepKind.RESTART_SERVICE, 'restart the database')),
+    ("notify the team with message 'Service down'", Step('action', StepKind.NOTIFY_TEAM, 'Service down')),
+    ('notify the team', Step('action', StepKind.NOTIFY_TEAM, 'No message provided')),
+    ('page someone', Step('action', StepKind.UNKNOWN, 'page someone'))
+])
+def test_classify_step(text, expected):
+    assert classify_step('action', text) == expected
@@ -0,0 +1,69 @@
+import sys
+import os
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from models import Runbook, Step, StepKind
+from runbook_index import RunbookIndex
+from bench_runbook_index import hashing_encoder
+
+def runbook(title: str, *actions: str) -> Runbook:
+    return Runbook(title, title.lower().replace(' ', '_'), tuple(Step(action, StepKind.UNKNOWN) for action in actions))
+
+RUNBOOKS = [
+    runbook('Disk full', 'clean up old logs on the disk'),
+    runbook('High CPU usage', 'check CPU usage metric if above 90'),
+    runbook('Database connection timeouts', 'restart the database service')
+]
+
+@pytest.fixture
+def index():
+    return RunbookIndex(RUNBOOKS, hashing_encoder())
+
+def test_runbook_text_combines_title_type_and_steps(index):
+    assert index.runbook_text(RUNBOOKS[1]) == 'High CPU usage high_cpu_usage check CPU usage metric if above 90'
+
+def test_embeddings_are_contiguous_and_normalized(index):
+    assert index.embeddings.flags['C_CONTIGUOUS']
+    assert index.embeddings.dtype == np.float32
+    assert np.allclose(np.linalg.norm(index.embeddings, axis=1), 1.0)
+
+def test_search_orders_top_k_by_score(index):
+    matches = index.search('disk full on host a', top_k=2)
+    assert len(matches) == 2
+    assert matches[0][0] is RUNBOOKS[0]
+    scores = [score for _, score in matches]
+    assert scores == sorted(scores, reverse=True)
+    assert 0.0 < scores[0] <= 1.0
+
+def test_search_scores_are_cosine_similarities(index):
+    encoder = hashing_encoder()
+    text = 'database connection timeouts'
+    expected = index.normalize(encoder([index.runbook_text(RUNBOOKS[2])]))[0] @ index.normalize(encoder([text]))[0]
+    match, score = index.search(text, top_k=1)[0]
+    assert match is RUNBOOKS[2]
+    assert score == pytest.approx(float(expected))
+
+def test_search_caps_top_k_at_runbook_count(index):
+    matches = index.search('restart the database service', top_k=10)
+    assert sorted(match.title for match, _ in matches) == sorted(runbook.title for runbook in RUNBOOKS)
+
+def test_search_empty_index_and_empty_query(index):
+    assert RunbookIndex([], hashing_encoder()).search('disk full') == []
+    assert index.search('') == []
+
+def test_zero_norm_vectors_score_zero():
+    encoder = hashing_encoder()
+
+    def encode_blank_as_zero(texts):
+        vectors = encoder(texts)
+        vectors[[not text.strip() for text in texts]] = 0.0
+        return vectors
+
+    index = RunbookIndex(RUNBOOKS + [Runbook('', None, ())], encode_blank_as_zero)
+    assert not np.isnan(index.embeddings).any()
+    assert np.linalg.norm(index.embeddings[-1]) == 0.0
+    matches = index.search('   ', top_k=4)
+    assert [score for _, score in matches] == [0.0] * 4